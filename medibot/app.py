@@ -1,12 +1,22 @@
 import os
 import json
 import logging
-from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, session
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+from flask import Flask, render_template, request, jsonify, session, g, has_request_context
 from flask_migrate import Migrate
-from models import db, User, ChatSession, ChatMessage, DailyUsage, Disease, SubscriptionPlan
+from models import db, User, ChatSession, ChatMessage, DailyUsage, Disease, SubscriptionPlan, utcnow
 from model import SymptomMatcher
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import flag_modified
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; data files are parsed with the stdlib json module
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -26,58 +36,96 @@ app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db.init_app(app)
 migrate = Migrate(app, db)
 
+# In development, warn about requests that issue many queries, which usually means an
+# N+1 lazy-load pattern (nplusone would flag these, but it does not support SQLAlchemy 2.x)
+if os.environ.get('FLASK_ENV') == 'development':
+    QUERY_COUNT_WARNING = int(os.environ.get('QUERY_COUNT_WARNING', 10))
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def count_request_queries(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            g.query_count = g.get('query_count', 0) + 1
+
+    @app.after_request
+    def report_query_count(response):
+        query_count = g.get('query_count', 0)
+        if query_count > QUERY_COUNT_WARNING:
+            logging.warning(f"{request.method} {request.path} issued {query_count} queries")
+        return response
+
 # Global variables
 symptom_matcher = None
 
+# (mtime, parsed data) for languages.json, replaced as one tuple so threads never see a mix
+_LANGUAGES_CACHE = None
+
+# Snapshots of SubscriptionPlan rows keyed by plan_key; plans only change on data reload
+_PLAN_CACHE = {}
+
+def load_json_file(path):
+    """Parse a JSON data file, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 def load_initial_data():
     """Load initial subscription plans and diseases from JSON files"""
     try:
         # Load plans data
-        with open('plans.json', 'r') as f:
-            plans_data = json.load(f)
+        plans_data = load_json_file('plans.json')
         
-        # Add subscription plans to database
+        # Diff plans against the keys already stored so the sync is one SELECT plus bulk writes
+        existing_plan_ids = {plan_key: plan_id for plan_id, plan_key in
+                             db.session.query(SubscriptionPlan.id, SubscriptionPlan.plan_key).all()}
+        plans_to_insert = []
+        plans_to_update = []
         for plan_key, plan_info in plans_data.items():
-            existing_plan = SubscriptionPlan.query.filter_by(plan_key=plan_key).first()
-            if not existing_plan:
-                plan = SubscriptionPlan(
-                    plan_key=plan_key,
-                    name=plan_info['name'],
-                    price=plan_info['price'],
-                    max_chats_per_day=plan_info['max_chats_per_day'],
-                    max_bot_responses_per_chat=plan_info['max_bot_responses_per_chat'],
-                    medicine_images=plan_info['medicine_images'],
-                    chat_history=plan_info['chat_history'],
-                    voice_chat=plan_info['voice_chat'],
-                    available_languages=plan_info['available_languages'],
-                    layout=plan_info['layout'],
-                    features=plan_info['features']
-                )
-                db.session.add(plan)
+            if plan_key not in existing_plan_ids:
+                plans_to_insert.append({
+                    'plan_key': plan_key,
+                    'name': plan_info['name'],
+                    'price': plan_info['price'],
+                    'max_chats_per_day': plan_info['max_chats_per_day'],
+                    'max_bot_responses_per_chat': plan_info['max_bot_responses_per_chat'],
+                    'medicine_images': plan_info['medicine_images'],
+                    'chat_history': plan_info['chat_history'],
+                    'voice_chat': plan_info['voice_chat'],
+                    'available_languages': plan_info['available_languages'],
+                    'layout': plan_info['layout'],
+                    'features': plan_info['features']
+                })
             else:
                 # Update existing plan with new fields
-                existing_plan.max_bot_responses_per_chat = plan_info['max_bot_responses_per_chat']
-                existing_plan.layout = plan_info['layout']
-                existing_plan.voice_chat = plan_info['voice_chat']
-                existing_plan.available_languages = plan_info['available_languages']
-                existing_plan.features = plan_info['features']
+                plans_to_update.append({
+                    'id': existing_plan_ids[plan_key],
+                    'max_bot_responses_per_chat': plan_info['max_bot_responses_per_chat'],
+                    'layout': plan_info['layout'],
+                    'voice_chat': plan_info['voice_chat'],
+                    'available_languages': plan_info['available_languages'],
+                    'features': plan_info['features']
+                })
+        db.session.bulk_insert_mappings(SubscriptionPlan, plans_to_insert)
+        db.session.bulk_update_mappings(SubscriptionPlan, plans_to_update)
         
         # Load diseases data
-        with open('diseases_data.json', 'r') as f:
-            diseases_data = json.load(f)
+        diseases_data = load_json_file('diseases_data.json')
         
-        # Add diseases to database
-        for disease_info in diseases_data:
-            existing_disease = Disease.query.filter_by(name=disease_info['disease']).first()
-            if not existing_disease:
-                disease = Disease(
-                    name=disease_info['disease'],
-                    symptoms=disease_info['symptoms'],
-                    medicines=disease_info['medicines']
-                )
-                db.session.add(disease)
+        # Add missing diseases to database
+        existing_diseases = {name for (name,) in db.session.query(Disease.name).all()}
+        db.session.bulk_insert_mappings(Disease, [
+            {
+                'name': disease_info['disease'],
+                'symptoms': disease_info['symptoms'],
+                'medicines': disease_info['medicines']
+            }
+            for disease_info in diseases_data
+            if disease_info['disease'] not in existing_diseases
+        ])
         
         db.session.commit()
+        load_plan_cache()
         logging.info("Initial data loaded successfully")
         
     except Exception as e:
@@ -102,11 +150,29 @@ def init_symptom_matcher():
     diseases_data = get_diseases_data()
     symptom_matcher = SymptomMatcher(diseases_data)
 
+def _snapshot_plan(plan):
+    """Copy a SubscriptionPlan row into a plain object that outlives the DB session"""
+    return SimpleNamespace(**{column.name: getattr(plan, column.name)
+                              for column in SubscriptionPlan.__table__.columns})
+
+def load_plan_cache():
+    """(Re)populate the in-process subscription plan cache from the database"""
+    global _PLAN_CACHE
+    # Swap in a complete dict so concurrent readers never see a partially filled cache
+    _PLAN_CACHE = {plan.plan_key: _snapshot_plan(plan) for plan in SubscriptionPlan.query.all()}
+
+def get_plan(plan_key):
+    """Get subscription plan by key, reloading the plan cache only on a miss"""
+    if plan_key not in _PLAN_CACHE:
+        load_plan_cache()
+    return _PLAN_CACHE.get(plan_key)
+
 def get_plans_data():
-    """Get subscription plans data from database"""
-    plans = SubscriptionPlan.query.all()
+    """Get subscription plans data from the plan cache"""
+    if not _PLAN_CACHE:
+        load_plan_cache()
     plans_dict = {}
-    for plan in plans:
+    for plan in _PLAN_CACHE.values():
         plans_dict[plan.plan_key] = {
             'name': plan.name,
             'max_chats_per_day': plan.max_chats_per_day,
@@ -119,10 +185,16 @@ def get_plans_data():
     return plans_dict
 
 def load_languages():
-    """Load language translations from JSON file"""
+    """Load language translations from JSON file, cached until the file changes"""
+    global _LANGUAGES_CACHE
     try:
-        with open('languages.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        mtime = os.stat('languages.json').st_mtime
+        cached = _LANGUAGES_CACHE
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        data = load_json_file('languages.json')
+        _LANGUAGES_CACHE = (mtime, data)
+        return data
     except FileNotFoundError:
         logging.error("languages.json file not found")
         return {"languages": {"en": {"name": "English", "flag": "🇺🇸"}}}
@@ -132,14 +204,13 @@ def load_languages():
 
 def get_user_language():
     """Get user language from database"""
-    user_id = get_user_id()
-    user = get_or_create_user(user_id)
+    user = current_user()
     return user.language if hasattr(user, 'language') else 'en'
 
 def get_available_languages(user_plan):
-    """Get available languages based on user plan"""
+    """Get available languages for a plan object, or a plan key resolved via the plan cache"""
     if isinstance(user_plan, str):
-        plan_data = SubscriptionPlan.query.filter_by(plan_key=user_plan).first()
+        plan_data = get_plan(user_plan)
     else:
         plan_data = user_plan
     
@@ -149,73 +220,84 @@ def get_available_languages(user_plan):
 
 def get_localized_text(key, language='en', **kwargs):
     """Get localized text for given key and language"""
-    languages_data = load_languages()
-    lang_data = languages_data.get('languages', {}).get(language, {})
+    # Resolve the languages mapping once per request rather than on every lookup
+    if 'languages' not in g:
+        g.languages = load_languages().get('languages', {})
     
-    if key not in lang_data:
+    text = g.languages.get(language, {}).get(key)
+    if text is None:
         # Fallback to English
-        lang_data = languages_data.get('languages', {}).get('en', {})
+        text = g.languages.get('en', {}).get(key, key)
     
-    text = lang_data.get(key, key)
+    if not kwargs:
+        return text
     
     # Format text with provided kwargs
-    if kwargs:
-        try:
-            text = text.format(**kwargs)
-        except (KeyError, ValueError):
-            pass  # Return unformatted text if formatting fails
-    
-    return text
+    try:
+        return text.format(**kwargs)
+    except (KeyError, ValueError):
+        return text  # Return unformatted text if formatting fails
+
+def get_or_create_user(user_id, commit=True):
+    """Get or create user in database
 
-def get_or_create_user(user_id):
-    """Get or create user in database"""
+    With commit=False a new user is only flushed, so the caller's own commit persists it.
+    """
     user = User.query.filter_by(user_id=user_id).first()
     if not user:
         user = User(user_id=user_id, plan='basic')
-        db.session.add(user)
-        db.session.commit()
+        try:
+            # Flush inside a savepoint so a concurrent insert of the same user_id
+            # only rolls back this insert, not the caller's transaction
+            with db.session.begin_nested():
+                db.session.add(user)
+        except IntegrityError:
+            return User.query.filter_by(user_id=user_id).first()
+        if commit:
+            db.session.commit()
     return user
 
 def get_user_id():
     """Get or create user ID from session"""
     if 'user_id' not in session:
-        session['user_id'] = f"user_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        session['user_id'] = f"user_{uuid.uuid4().hex}"
     return session['user_id']
 
+def current_user(commit=True):
+    """Get or create the session's user, loading it at most once per request"""
+    if 'user' not in g:
+        g.user = get_or_create_user(get_user_id(), commit=commit)
+    return g.user
+
 def get_user_plan():
     """Get user plan string from database"""
-    user_id = get_user_id()
-    user = get_or_create_user(user_id)
-    return user.plan
+    return current_user().plan
 
 def get_user_plan_object():
-    """Get user plan object from database"""
-    user_id = get_user_id()
-    user = get_or_create_user(user_id)
-    return SubscriptionPlan.query.filter_by(plan_key=user.plan).first()
-
-def check_daily_limit(user_id, plan):
-    """Check if user has exceeded daily chat limit"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    user = get_or_create_user(user_id)
+    """Get user plan object from the plan cache"""
+    return get_plan(current_user().plan)
+
+def get_today():
+    """Get today's DailyUsage date key, computed once per request"""
+    if 'today' not in g:
+        g.today = date.today()
+    return g.today
+
+def check_daily_limit(user, plan_data):
+    """Check if user has exceeded daily chat limit for the already-loaded plan"""
+    today = get_today()
     
-    # Get or create daily usage record
+    # A missing usage record means no chats yet today; increment_daily_usage creates it
     usage = DailyUsage.query.filter_by(user_id=user.id, date=today).first()
-    if not usage:
-        usage = DailyUsage(user_id=user.id, date=today, chat_count=0)
-        db.session.add(usage)
-        db.session.commit()
+    chat_count = usage.chat_count if usage else 0
     
-    plan_key = plan if isinstance(plan, str) else plan.plan_key
-    plan_data = SubscriptionPlan.query.filter_by(plan_key=plan_key).first()
     max_chats = plan_data.max_chats_per_day if plan_data else 2
     
-    return usage.chat_count < max_chats
+    return chat_count < max_chats
 
-def increment_daily_usage(user_id):
+def increment_daily_usage(user, commit=True):
     """Increment daily usage counter"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    user = get_or_create_user(user_id)
+    today = get_today()
     
     usage = DailyUsage.query.filter_by(user_id=user.id, date=today).first()
     if not usage:
@@ -224,21 +306,21 @@ def increment_daily_usage(user_id):
     else:
         usage.chat_count += 1
     
-    db.session.commit()
+    if commit:
+        db.session.commit()
 
-def check_bot_response_limit(chat_session, plan):
+def check_bot_response_limit(chat_session, plan_data):
     """Check if bot has reached response limit for current chat"""
-    plan_key = plan if isinstance(plan, str) else plan.plan_key
-    plan_data = SubscriptionPlan.query.filter_by(plan_key=plan_key).first()
     if not plan_data or plan_data.max_bot_responses_per_chat == 999:  # Unlimited
         return False
     
     return chat_session.bot_response_count >= plan_data.max_bot_responses_per_chat
 
-def increment_bot_response_count(chat_session):
+def increment_bot_response_count(chat_session, commit=True):
     """Increment bot response counter for current chat"""
     chat_session.bot_response_count += 1
-    db.session.commit()
+    if commit:
+        db.session.commit()
 
 @app.route('/')
 def index():
@@ -262,11 +344,10 @@ def index():
 def switch_plan():
     """Switch user subscription plan"""
     new_plan = request.json.get('plan', 'basic')
-    plan_exists = SubscriptionPlan.query.filter_by(plan_key=new_plan).first()
+    plan_exists = get_plan(new_plan)
     
     if plan_exists:
-        user_id = get_user_id()
-        user = get_or_create_user(user_id)
+        user = current_user()
         user.plan = new_plan
         db.session.commit()
         return jsonify({'status': 'success', 'new_plan': new_plan})
@@ -276,14 +357,13 @@ def switch_plan():
 def switch_language():
     """Switch user language"""
     new_language = request.json.get('language', 'en')
-    user_id = get_user_id()
     user_plan = get_user_plan()
     
     # Check if language is available in current plan
     available_languages = get_available_languages(user_plan)
     
     if new_language in available_languages:
-        user = get_or_create_user(user_id)
+        user = current_user()
         user.language = new_language
         db.session.commit()
         
@@ -303,43 +383,45 @@ def switch_language():
 def chat():
     """Handle chat messages"""
     try:
-        user_id = get_user_id()
-        user_plan = get_user_plan()
+        # All writes below share one transaction, committed once at the end
+        user = current_user(commit=False)
+        user_plan = user.plan
         message = request.json.get('message', '').strip()
         
         if not message:
             return jsonify({'error': 'Message cannot be empty'}), 400
         
+        # Load the plan once and reuse it for every limit check below
+        plan_data = get_plan(user_plan)
+        
         # Check daily limit
-        if not check_daily_limit(user_id, user_plan):
-            plan_data = SubscriptionPlan.query.filter_by(plan_key=user_plan).first()
+        if not check_daily_limit(user, plan_data):
             max_chats = plan_data.max_chats_per_day if plan_data else 2
             return jsonify({
                 'error': f'Daily chat limit reached ({max_chats} chats). Please upgrade your plan or try again tomorrow.'
             }), 429
         
-        # Initialize symptom matcher if needed
+        # The matcher is built once at startup; rebuilding it here would query every disease per request
         if symptom_matcher is None:
-            init_symptom_matcher()
+            raise RuntimeError("Symptom matcher was not initialized at startup")
         
-        # Get or create user and session
-        user = get_or_create_user(user_id)
-        chat_session = ChatSession.query.filter_by(user_id=user.id).order_by(ChatSession.updated_at.desc()).first()
+        # Get or create session; database timestamps can tie within a second, so the newest id wins
+        chat_session = ChatSession.query.filter_by(user_id=user.id).order_by(
+            ChatSession.updated_at.desc(), ChatSession.id.desc()).first()
         
         if not chat_session:
             chat_session = ChatSession(
                 user_id=user.id,
-                session_data={'messages': [], 'current_symptoms': [], 'awaiting_symptoms': False},
+                session_data={'current_symptoms': [], 'awaiting_symptoms': False},
                 bot_response_count=0
             )
             db.session.add(chat_session)
-            db.session.commit()
+            db.session.flush()
             # Increment daily usage for new chat
-            increment_daily_usage(user_id)
+            increment_daily_usage(user, commit=False)
         
         # Check bot response limit for current chat session
-        if check_bot_response_limit(chat_session, user_plan):
-            plan_data = SubscriptionPlan.query.filter_by(plan_key=user_plan).first()
+        if check_bot_response_limit(chat_session, plan_data):
             max_responses = plan_data.max_bot_responses_per_chat if plan_data else 2
             return jsonify({
                 'message': f'Bot response limit reached for this chat ({max_responses} responses). Please start a new chat session.',
@@ -347,17 +429,14 @@ def chat():
             }), 200
         
         # Process the message
-        response = process_user_message(message, chat_session, user_plan)
+        response = process_user_message(message, chat_session, user_plan, plan_data)
         
-        # Save user message
+        # Save user message and bot response together so they flush as one batch
         user_message = ChatMessage(
             session_id=chat_session.id,
             message_type='user',
             content=message
         )
-        db.session.add(user_message)
-        
-        # Save bot response
         bot_message = ChatMessage(
             session_id=chat_session.id,
             message_type='bot',
@@ -365,35 +444,22 @@ def chat():
             disease=response.get('disease'),
             medicines=response.get('medicines', [])
         )
-        db.session.add(bot_message)
+        db.session.add_all([user_message, bot_message])
         
         # Increment bot response counter
-        increment_bot_response_count(chat_session)
+        increment_bot_response_count(chat_session, commit=False)
         
-        # Update session data
-        session_data = chat_session.session_data
-        session_data['messages'].append({
-            'type': 'user',
-            'content': message,
-            'timestamp': datetime.now().isoformat()
-        })
-        session_data['messages'].append({
-            'type': 'bot',
-            'content': response.get('message', ''),
-            'medicines': response.get('medicines', []),
-            'disease': response.get('disease', ''),
-            'timestamp': datetime.now().isoformat()
-        })
-        chat_session.session_data = session_data
-        chat_session.updated_at = datetime.now()
+        # Persist the symptom state mutated in place by process_user_message;
+        # the conversation itself lives in ChatMessage rows
+        flag_modified(chat_session, 'session_data')
+        chat_session.updated_at = utcnow()
         
         # Increment usage counter
-        increment_daily_usage(user_id)
+        increment_daily_usage(user, commit=False)
         
         db.session.commit()
         
         # Add bot response limit info to response
-        plan_data = SubscriptionPlan.query.filter_by(plan_key=user_plan).first()
         response['bot_responses_left'] = max(0, plan_data.max_bot_responses_per_chat - chat_session.bot_response_count) if plan_data and plan_data.max_bot_responses_per_chat != 999 else -1
         
         return jsonify(response)
@@ -407,29 +473,27 @@ def chat():
 def new_chat():
     """Start a new chat session"""
     try:
-        user_id = get_user_id()
-        user_plan = get_user_plan()
+        user = current_user(commit=False)
+        plan_data = get_plan(user.plan)
         
         # Check daily limit
-        if not check_daily_limit(user_id, user_plan):
-            plan_data = SubscriptionPlan.query.filter_by(plan_key=user_plan).first()
+        if not check_daily_limit(user, plan_data):
             max_chats = plan_data.max_chats_per_day if plan_data else 2
             return jsonify({
                 'error': f'Daily chat limit reached ({max_chats} chats). Please upgrade your plan or try again tomorrow.'
             }), 429
         
         # Create new chat session
-        user = get_or_create_user(user_id)
         chat_session = ChatSession(
             user_id=user.id,
-            session_data={'messages': [], 'current_symptoms': [], 'awaiting_symptoms': False},
+            session_data={'current_symptoms': [], 'awaiting_symptoms': False},
             bot_response_count=0
         )
         db.session.add(chat_session)
-        db.session.commit()
         
         # Increment daily usage
-        increment_daily_usage(user_id)
+        increment_daily_usage(user, commit=False)
+        db.session.commit()
         
         return jsonify({
             'message': 'New chat session started! How can I help you today?',
@@ -441,13 +505,13 @@ def new_chat():
         db.session.rollback()
         return jsonify({'error': 'Failed to start new chat. Please try again.'}), 500
 
-def process_user_message(message, chat_session, user_plan):
+def process_user_message(message, chat_session, user_plan, plan_data):
     """Process user message and generate appropriate response"""
     message_lower = message.lower()
     session_data = chat_session.session_data
     user_language = get_user_language()
     
-    # Extract symptoms from message
+    # Extract symptoms from message (the matcher expects lower-cased input)
     potential_symptoms = symptom_matcher.extract_symptoms(message_lower)
     
     if potential_symptoms:
@@ -466,38 +530,34 @@ def process_user_message(message, chat_session, user_plan):
             if disease_match:
                 medicines = disease_match.get('medicines', [])
                 
-                # Build medicine information based on plan
-                plan_data = SubscriptionPlan.query.filter_by(plan_key=user_plan).first()
-                medicines_text = ""
+                # Build medicine information and the plan-filtered medicine data in one pass
+                show_price = user_plan in ('pro', 'deluxe')
+                show_buy_link = user_plan == 'deluxe'
+                keep_all_data = bool(plan_data and plan_data.medicine_images)
+                medicine_lines = []
+                filtered_medicines = medicines if keep_all_data else []
                 
                 for med in medicines:
                     med_line = f"• {med['name']}"
+                    filtered_med = {'name': med['name']}
                     
                     # Add pricing for Pro and Deluxe plans
-                    if user_plan in ['pro', 'deluxe'] and 'price' in med:
+                    if show_price and 'price' in med:
                         med_line += f" - {med['price']}"
+                        filtered_med['price'] = med['price']
                     
                     # Add purchase links for Deluxe plan only
-                    if user_plan == 'deluxe' and 'buy_link' in med:
+                    if show_buy_link and 'buy_link' in med:
                         med_line += f" [Buy Now]({med['buy_link']})"
+                        filtered_med['buy_link'] = med['buy_link']
                     
-                    medicines_text += med_line + "\n"
-                
-                # Filter medicine data for response
-                if plan_data and plan_data.medicine_images:
-                    # Keep all data for pro and deluxe plans
-                    filtered_medicines = medicines
-                else:
-                    # Remove images for basic plan, keep pricing if available
-                    filtered_medicines = []
-                    for med in medicines:
-                        filtered_med = {'name': med['name']}
-                        if user_plan in ['pro', 'deluxe'] and 'price' in med:
-                            filtered_med['price'] = med['price']
-                        if user_plan == 'deluxe' and 'buy_link' in med:
-                            filtered_med['buy_link'] = med['buy_link']
+                    medicine_lines.append(med_line)
+                    if not keep_all_data:
+                        # Remove images for basic plan, keep pricing if available
                         filtered_medicines.append(filtered_med)
                 
+                medicines_text = "\n".join(medicine_lines)
+                
                 # Build localized response message
                 symptoms_text = ', '.join(session_data['current_symptoms'])
                 
@@ -540,30 +600,32 @@ def process_user_message(message, chat_session, user_plan):
                 'message': get_localized_text('welcome_message', user_language)
             }
 
+# Additional health advice shown to deluxe plan users, keyed by disease name
+_ADVICE_MAP = {
+    'Common Cold': "• Stay hydrated by drinking plenty of fluids\n• Get adequate rest\n• Consider using a humidifier\n• Consult a doctor if symptoms persist beyond 10 days",
+    'Fever': "• Stay hydrated with water and clear fluids\n• Rest in a cool environment\n• Monitor your temperature regularly\n• Seek medical attention if fever exceeds 103°F (39.4°C)",
+    'Headache': "• Apply a cold or warm compress to your head\n• Stay hydrated\n• Try relaxation techniques\n• Avoid known triggers\n• See a doctor for severe or persistent headaches",
+    'Stomach Upset': "• Eat bland foods like toast or rice\n• Stay hydrated with clear fluids\n• Avoid dairy and fatty foods\n• Rest and avoid strenuous activity\n• Consult a doctor if symptoms worsen",
+    'Allergies': "• Avoid known allergens when possible\n• Keep windows closed during high pollen days\n• Shower after being outdoors\n• Use air purifiers indoors\n• Track your symptoms to identify triggers",
+    'Cough': "• Stay hydrated to thin mucus\n• Use a humidifier or breathe steam\n• Avoid irritants like smoke\n• Try throat lozenges for sore throat\n• See a doctor if cough persists beyond 2 weeks"
+}
+_DEFAULT_ADVICE = "• Follow medication instructions carefully\n• Stay hydrated and get adequate rest\n• Monitor your symptoms\n• Consult a healthcare professional if symptoms worsen"
+
 def get_health_advice(disease):
     """Get additional health advice for deluxe plan users"""
-    advice_map = {
-        'Common Cold': "• Stay hydrated by drinking plenty of fluids\n• Get adequate rest\n• Consider using a humidifier\n• Consult a doctor if symptoms persist beyond 10 days",
-        'Fever': "• Stay hydrated with water and clear fluids\n• Rest in a cool environment\n• Monitor your temperature regularly\n• Seek medical attention if fever exceeds 103°F (39.4°C)",
-        'Headache': "• Apply a cold or warm compress to your head\n• Stay hydrated\n• Try relaxation techniques\n• Avoid known triggers\n• See a doctor for severe or persistent headaches",
-        'Stomach Upset': "• Eat bland foods like toast or rice\n• Stay hydrated with clear fluids\n• Avoid dairy and fatty foods\n• Rest and avoid strenuous activity\n• Consult a doctor if symptoms worsen",
-        'Allergies': "• Avoid known allergens when possible\n• Keep windows closed during high pollen days\n• Shower after being outdoors\n• Use air purifiers indoors\n• Track your symptoms to identify triggers",
-        'Cough': "• Stay hydrated to thin mucus\n• Use a humidifier or breathe steam\n• Avoid irritants like smoke\n• Try throat lozenges for sore throat\n• See a doctor if cough persists beyond 2 weeks"
-    }
-    return advice_map.get(disease, "• Follow medication instructions carefully\n• Stay hydrated and get adequate rest\n• Monitor your symptoms\n• Consult a healthcare professional if symptoms worsen")
+    return _ADVICE_MAP.get(disease, _DEFAULT_ADVICE)
 
 @app.route('/usage_stats')
 def usage_stats():
     """Get usage statistics for current user"""
-    user_id = get_user_id()
-    user_plan = get_user_plan()
-    today = datetime.now().strftime('%Y-%m-%d')
+    user = current_user()
+    user_plan = user.plan
+    today = get_today()
     
-    user = get_or_create_user(user_id)
     usage = DailyUsage.query.filter_by(user_id=user.id, date=today).first()
     current_usage = usage.chat_count if usage else 0
     
-    plan_data = SubscriptionPlan.query.filter_by(plan_key=user_plan).first()
+    plan_data = get_plan(user_plan)
     max_chats = plan_data.max_chats_per_day if plan_data else 2
     
     return jsonify({
@@ -601,4 +663,5 @@ with app.app_context():
     init_symptom_matcher()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Debugger and reloader only in development; production runs under gunicorn
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_ENV') == 'development')
\ No newline at end of file
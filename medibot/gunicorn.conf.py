@@ -0,0 +1,25 @@
+import multiprocessing
+import os
+
+# Production server settings, used with: gunicorn -c gunicorn.conf.py main:app
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Requests mostly wait on PostgreSQL, so threaded workers let those waits overlap
+# without monkey-patching the database driver the way gevent workers would need
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import the app once in the master so schema creation and data loading run a single time,
+# instead of every worker racing on CREATE TABLE / CREATE TYPE against a fresh database
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Forget database connections inherited from the master; each worker opens its own"""
+    from app import app
+    from models import db
+    with app.app_context():
+        # close=False leaves the sockets alone: closing them here would end the master's
+        # sessions on the server, which sibling workers inherited too
+        db.engine.dispose(close=False)
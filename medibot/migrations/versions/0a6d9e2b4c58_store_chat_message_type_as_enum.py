@@ -0,0 +1,57 @@
+"""Store chat message type as an enum
+
+Revision ID: 0a6d9e2b4c58
+Revises: e19b6a3c5d07
+Create Date: 2026-10-15 13:14:21.905737
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6d9e2b4c58'
+down_revision = 'e19b6a3c5d07'
+branch_labels = None
+depends_on = None
+
+message_type_enum = sa.Enum('user', 'bot', name='message_type_enum', create_constraint=True)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # Native enum type, converted in place
+        postgresql.ENUM('user', 'bot', name='message_type_enum').create(bind, checkfirst=True)
+        op.alter_column('chat_messages', 'message_type',
+                        existing_type=sa.String(length=10),
+                        type_=message_type_enum,
+                        existing_nullable=False,
+                        postgresql_using='message_type::message_type_enum')
+        return
+
+    # Elsewhere the enum is a short VARCHAR guarded by a CHECK constraint
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.alter_column('message_type',
+                              existing_type=sa.String(length=10),
+                              type_=message_type_enum,
+                              existing_nullable=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.alter_column('chat_messages', 'message_type',
+                        existing_type=message_type_enum,
+                        type_=sa.String(length=10),
+                        existing_nullable=False,
+                        postgresql_using='message_type::text')
+        postgresql.ENUM(name='message_type_enum').drop(bind, checkfirst=True)
+        return
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.alter_column('message_type',
+                              existing_type=message_type_enum,
+                              type_=sa.String(length=10),
+                              existing_nullable=False)
@@ -0,0 +1,56 @@
+"""Store JSON columns as JSONB on PostgreSQL and index disease symptoms
+
+Revision ID: c4a81e5f2d69
+Revises: 9b2e4c7d1f30
+Create Date: 2026-10-15 10:41:05.118024
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a81e5f2d69'
+down_revision = '9b2e4c7d1f30'
+branch_labels = None
+depends_on = None
+
+# (table, column, nullable) for every column switched to JSONB
+JSON_COLUMNS = [
+    ('chat_sessions', 'session_data', False),
+    ('chat_messages', 'medicines', True),
+    ('diseases', 'symptoms', False),
+    ('diseases', 'medicines', False),
+    ('subscription_plans', 'available_languages', False),
+    ('subscription_plans', 'features', False),
+]
+
+
+def upgrade():
+    # Other backends keep their generic JSON storage
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column, nullable in JSON_COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=sa.JSON(),
+                        type_=postgresql.JSONB(),
+                        existing_nullable=nullable,
+                        postgresql_using=f'{column}::jsonb')
+
+    op.create_index('ix_disease_symptoms_gin', 'diseases', ['symptoms'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_disease_symptoms_gin', table_name='diseases', postgresql_using='gin')
+
+    for table, column, nullable in JSON_COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=postgresql.JSONB(),
+                        type_=sa.JSON(),
+                        existing_nullable=nullable,
+                        postgresql_using=f'{column}::json')
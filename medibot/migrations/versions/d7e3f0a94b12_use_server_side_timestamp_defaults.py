@@ -0,0 +1,53 @@
+"""Use server-side defaults for created_at and updated_at timestamps
+
+Revision ID: d7e3f0a94b12
+Revises: c4a81e5f2d69
+Create Date: 2026-10-15 11:20:36.842570
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e3f0a94b12'
+down_revision = 'c4a81e5f2d69'
+branch_labels = None
+depends_on = None
+
+# Timestamp columns per table that get a current UTC time default
+TIMESTAMP_COLUMNS = {
+    'users': ('created_at', 'updated_at'),
+    'chat_sessions': ('created_at', 'updated_at'),
+    'chat_messages': ('created_at',),
+    'daily_usage': ('created_at', 'updated_at'),
+    'diseases': ('created_at', 'updated_at'),
+    'subscription_plans': ('created_at', 'updated_at'),
+}
+
+
+def upgrade():
+    # Existing rows hold naive UTC times; PostgreSQL's CURRENT_TIMESTAMP would store the
+    # session time zone's local time, so it is converted to UTC there
+    if op.get_bind().dialect.name == 'postgresql':
+        utc_now = sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")
+    else:
+        utc_now = sa.text('CURRENT_TIMESTAMP')
+
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column,
+                                      existing_type=sa.DateTime(),
+                                      existing_nullable=False,
+                                      server_default=utc_now)
+
+
+def downgrade():
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column,
+                                      existing_type=sa.DateTime(),
+                                      existing_nullable=False,
+                                      server_default=None)
@@ -0,0 +1,40 @@
+"""Store daily usage date as a native DATE column
+
+Revision ID: e19b6a3c5d07
+Revises: d7e3f0a94b12
+Create Date: 2026-10-15 11:58:09.274613
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e19b6a3c5d07'
+down_revision = 'd7e3f0a94b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite keeps DATE values as the same YYYY-MM-DD text, so existing rows already read back
+    # as dates; a batch table copy would CAST them to numbers and lose the data
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+
+    op.alter_column('daily_usage', 'date',
+                    existing_type=sa.String(length=10),
+                    type_=sa.Date(),
+                    existing_nullable=False,
+                    postgresql_using='date::date')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+
+    op.alter_column('daily_usage', 'date',
+                    existing_type=sa.Date(),
+                    type_=sa.String(length=10),
+                    existing_nullable=False,
+                    postgresql_using="to_char(date, 'YYYY-MM-DD')")
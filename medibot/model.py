@@ -1,6 +1,69 @@
 import json
 import logging
-from typing import List, Dict, Optional
+import re
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # Optional speedup; extraction falls back to a compiled regex
+    ahocorasick = None
+
+# Informal symptom words added to the keyword vocabulary, with the symptom they stand for
+_SYMPTOM_SYNONYMS: Dict[str, str] = {
+    'temperature': 'fever',
+    'runny nose': 'nasal congestion',
+    'stuffy nose': 'nasal congestion',
+    'stomach ache': 'stomach pain',
+    'tummy ache': 'stomach pain',
+    'belly ache': 'stomach pain',
+    'sick': 'nausea',
+    'throwing up': 'vomiting',
+    'sneezing': 'sneeze',
+    'coughing': 'cough',
+    'tired': 'fatigue',
+    'exhausted': 'fatigue',
+    'drowsy': 'fatigue'
+}
+
+# Common phrases that indicate a symptom without naming it
+_SYMPTOM_PATTERNS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('fever', ('hot', 'temperature', 'feverish', 'burning up')),
+    ('headache', ('head hurts', 'head pain', 'migraine')),
+    ('stomach pain', ('stomach hurts', 'belly pain', 'tummy pain', 'stomach ache')),
+    ('sore throat', ('throat hurts', 'painful throat', 'throat pain')),
+    ('cough', ('coughing', 'hacking')),
+    ('nausea', ('feel sick', 'queasy', 'sick to stomach')),
+    ('fatigue', ('tired', 'exhausted', 'weak', 'no energy')),
+    ('runny nose', ('stuffy nose', 'blocked nose', 'congested')),
+    ('sneezing', ('sneezing', 'achoo')),
+    ('chills', ('cold', 'shivering', 'shaking')),
+)
+
+# Canonical symptoms and the related terms that count as partial matches
+_SYNONYM_GROUPS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('fever', ('temperature', 'hot', 'feverish')),
+    ('headache', ('head pain', 'migraine')),
+    ('stomach pain', ('stomach ache', 'belly pain', 'abdominal pain')),
+    ('sore throat', ('throat pain', 'painful throat')),
+    ('runny nose', ('nasal congestion', 'stuffy nose')),
+    ('fatigue', ('tired', 'exhausted', 'weakness')),
+    ('nausea', ('sick', 'queasy')),
+    ('chills', ('cold', 'shivering')),
+)
+
+# Every term of a synonym group, including the canonical symptom, mapped to that canonical symptom
+_SYNONYM_TO_CANONICAL: Dict[str, str] = {
+    sys.intern(term): sys.intern(canonical)
+    for canonical, synonyms in _SYNONYM_GROUPS
+    for term in (canonical,) + synonyms
+}
+
+# Messages longer than this skip the extraction cache: they rarely repeat, and caching them
+# would let arbitrary client text pin memory in every worker
+_MAX_CACHED_MESSAGE_LENGTH = 256
 
 class SymptomMatcher:
     """AI-powered symptom matching engine for disease identification"""
@@ -8,87 +71,177 @@ class SymptomMatcher:
     def __init__(self, diseases_data: List[Dict]):
         """Initialize with diseases database"""
         self.diseases_data = diseases_data
+        # Lower-cased once here and shared by every index built below; the same names repeat
+        # across many diseases, so interning keeps one shared string per name, and lookups on
+        # interned keys short-circuit on identity
+        self._disease_symptoms_lower = [
+            [sys.intern(symptom.lower()) for symptom in disease.get('symptoms', [])]
+            for disease in diseases_data
+        ]
         self.symptom_keywords = self._build_symptom_keywords()
+        self._phrase_labels = self._build_phrase_labels()
+        self._phrase_automaton = self._build_phrase_automaton()
+        if self._phrase_automaton is None:
+            self._phrase_pattern, self._phrase_prefix_labels = self._build_phrase_pattern()
+        self._symptom_rows = self._build_symptom_rows()
+        self._disease_sizes = [len(symptoms) for symptoms in self._disease_symptoms_lower]
+        self._disease_by_name = {}
+        for disease in diseases_data:
+            # setdefault keeps the first entry when a name repeats, as the old scan did
+            self._disease_by_name.setdefault(disease['disease'].lower(), disease)
+        # Chat traffic repeats the same messages and symptom lists, so results are memoized
+        # per matcher; cached values are tuples or shared disease dicts and never mutated
+        self._extract_cached = lru_cache(maxsize=4096)(self._extract_symptoms)
+        self._match_cached = lru_cache(maxsize=4096)(self._match_disease)
         
     def _build_symptom_keywords(self) -> set:
         """Build a comprehensive set of symptom keywords from the database"""
         keywords = set()
-        for disease in self.diseases_data:
-            for symptom in disease.get('symptoms', []):
-                keywords.add(symptom.lower())
+        for symptoms in self._disease_symptoms_lower:
+            for symptom in symptoms:
+                keywords.add(symptom)
                 # Add common variations
                 if 'ache' in symptom:
-                    keywords.add(symptom.replace('ache', 'pain'))
+                    keywords.add(sys.intern(symptom.replace('ache', 'pain')))
                 if 'pain' in symptom:
-                    keywords.add(symptom.replace('pain', 'ache'))
+                    keywords.add(sys.intern(symptom.replace('pain', 'ache')))
         
         # Add common symptom synonyms
-        symptom_synonyms = {
-            'temperature': 'fever',
-            'runny nose': 'nasal congestion',
-            'stuffy nose': 'nasal congestion',
-            'stomach ache': 'stomach pain',
-            'tummy ache': 'stomach pain',
-            'belly ache': 'stomach pain',
-            'sick': 'nausea',
-            'throwing up': 'vomiting',
-            'sneezing': 'sneeze',
-            'coughing': 'cough',
-            'tired': 'fatigue',
-            'exhausted': 'fatigue',
-            'drowsy': 'fatigue'
-        }
-        
-        for synonym, standard in symptom_synonyms.items():
-            keywords.add(synonym)
-            
+        keywords.update(map(sys.intern, _SYMPTOM_SYNONYMS))
+        
         return keywords
     
-    def extract_symptoms(self, message: str) -> List[str]:
-        """Extract symptoms from user message using keyword matching"""
-        message_lower = message.lower()
-        detected_symptoms = []
-        
-        # Direct keyword matching
+    def _build_phrase_labels(self) -> Dict[str, tuple]:
+        """Map every keyword and symptom pattern phrase to the symptom labels it reports"""
+        phrase_labels = defaultdict(list)
         for keyword in self.symptom_keywords:
-            if keyword in message_lower:
-                detected_symptoms.append(keyword)
-        
-        # Pattern-based extraction for common phrases
-        symptom_patterns = {
-            'fever': ['hot', 'temperature', 'feverish', 'burning up'],
-            'headache': ['head hurts', 'head pain', 'migraine'],
-            'stomach pain': ['stomach hurts', 'belly pain', 'tummy pain', 'stomach ache'],
-            'sore throat': ['throat hurts', 'painful throat', 'throat pain'],
-            'cough': ['coughing', 'hacking'],
-            'nausea': ['feel sick', 'queasy', 'sick to stomach'],
-            'fatigue': ['tired', 'exhausted', 'weak', 'no energy'],
-            'runny nose': ['stuffy nose', 'blocked nose', 'congested'],
-            'sneezing': ['sneezing', 'achoo'],
-            'chills': ['cold', 'shivering', 'shaking']
-        }
-        
-        for symptom, patterns in symptom_patterns.items():
+            phrase_labels[keyword].append(keyword)
+        for symptom, patterns in _SYMPTOM_PATTERNS:
+            symptom = sys.intern(symptom)
             for pattern in patterns:
-                if pattern in message_lower and symptom not in detected_symptoms:
-                    detected_symptoms.append(symptom)
+                if symptom not in phrase_labels[pattern]:
+                    phrase_labels[pattern].append(symptom)
+        return {phrase: tuple(labels) for phrase, labels in phrase_labels.items()}
+    
+    def _build_phrase_automaton(self):
+        """Compile all phrases into one Aho-Corasick automaton when available"""
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for phrase, labels in self._phrase_labels.items():
+            automaton.add_word(phrase, labels)
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_phrase_pattern(self):
+        """Compile all phrases into one regex alternation, used when pyahocorasick is missing"""
+        phrases = sorted(self._phrase_labels, key=len, reverse=True)
+        # The zero-width lookahead is tried at every position, so overlapping phrases are all
+        # found as with the automaton; the longest phrase starting at a position wins there
+        pattern = re.compile('(?=(' + '|'.join(re.escape(phrase) for phrase in phrases) + '))')
+        
+        # A match therefore also stands for every shorter phrase it starts with
+        prefix_labels = {}
+        for phrase in phrases:
+            labels = []
+            for prefix in phrases:
+                if phrase.startswith(prefix):
+                    labels.extend(label for label in self._phrase_labels[prefix] if label not in labels)
+            prefix_labels[phrase] = tuple(labels)
+        return pattern, prefix_labels
+    
+    def _build_symptom_rows(self) -> Dict[str, Tuple[Tuple[int, int, float], ...]]:
+        """Precompute, for every known symptom, its score contribution to each disease
+
+        Rows hold (disease position, exact match, partial match) entries, so scoring a message
+        is one pass over plain tuples instead of re-deriving synonym overlaps per request.
+        """
+        # Sparse symptom-by-disease incidence matrix stored column-wise, plus one per synonym group
+        postings: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        synonym_postings: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        for index, symptoms in enumerate(self._disease_symptoms_lower):
+            for symptom in symptoms:
+                postings[symptom][index] += 1
+                group = _SYNONYM_TO_CANONICAL.get(symptom)
+                if group is not None:
+                    synonym_postings[group][index] += 1
         
-        return detected_symptoms
+        symptom_rows = {}
+        for symptom in postings.keys() | _SYNONYM_TO_CANONICAL.keys():
+            occurrences = postings.get(symptom, {})
+            group = _SYNONYM_TO_CANONICAL.get(symptom)
+            if group is None:
+                symptom_rows[symptom] = tuple((index, 1, 0.0) for index in sorted(occurrences))
+                continue
+            
+            # Each disease symptom in the same synonym group, other than the symptom itself,
+            # is a partial match worth 0.5
+            group_counts = synonym_postings[group]
+            symptom_rows[symptom] = tuple(
+                (index, 1 if index in occurrences else 0,
+                 0.5 * (group_counts.get(index, 0) - occurrences.get(index, 0)))
+                for index in sorted(occurrences.keys() | group_counts.keys())
+            )
+        return symptom_rows
+    
+    def extract_symptoms(self, message_lower: str) -> List[str]:
+        """Extract symptoms from an already lower-cased user message using keyword matching
+
+        Callers normalize the message once; it is not lower-cased again here.
+        """
+        # Whitespace is collapsed so trivially different messages share a cache entry
+        message = ' '.join(message_lower.split())
+        if len(message) > _MAX_CACHED_MESSAGE_LENGTH:
+            return list(self._extract_symptoms(message))
+        return list(self._extract_cached(message))
+    
+    def _extract_symptoms(self, message_lower: str) -> Tuple[str, ...]:
+        """Uncached symptom extraction behind extract_symptoms"""
+        # Keywords and common phrases are matched together, in a single pass over the
+        # message when the automaton is built
+        if self._phrase_automaton is not None:
+            matched_labels = (labels for _, labels in self._phrase_automaton.iter(message_lower))
+        else:
+            matched_labels = (self._phrase_prefix_labels[match.group(1)]
+                              for match in self._phrase_pattern.finditer(message_lower))
+        
+        detected_symptoms = []
+        for labels in matched_labels:
+            for label in labels:
+                if label not in detected_symptoms:
+                    detected_symptoms.append(label)
+        
+        return tuple(detected_symptoms)
     
     def match_disease(self, user_symptoms: List[str]) -> Optional[Dict]:
         """Match user symptoms to diseases and return best match"""
+        return self._match_cached(tuple(user_symptoms))
+    
+    def _match_disease(self, user_symptoms: Tuple[str, ...]) -> Optional[Dict]:
+        """Uncached disease matching behind match_disease"""
         if not user_symptoms:
             return None
         
+        # Multiply the incidence matrix by the user's symptom vector: only the rows for the
+        # user's symptoms are visited, so diseases sharing nothing with the user cost nothing
+        exact_matches = defaultdict(int)
+        partial_matches = defaultdict(float)
+        for symptom in user_symptoms:
+            for index, exact, partial in self._symptom_rows.get(symptom.lower(), ()):
+                exact_matches[index] += exact
+                partial_matches[index] += partial
+        
         best_match = None
         best_score = 0
         
-        for disease in self.diseases_data:
-            score = self._calculate_match_score(user_symptoms, disease['symptoms'])
+        for index in sorted(exact_matches):
+            score = self._calculate_match_score(exact_matches[index], partial_matches[index],
+                                                len(user_symptoms), self._disease_sizes[index])
             
             if score > best_score:
                 best_score = score
-                best_match = disease
+                best_match = self.diseases_data[index]
         
         # Only return match if confidence is high enough
         if best_score >= 0.3:  # At least 30% match
@@ -96,47 +249,19 @@ class SymptomMatcher:
         
         return None
     
-    def _calculate_match_score(self, user_symptoms: List[str], disease_symptoms: List[str]) -> float:
-        """Calculate matching score between user symptoms and disease symptoms"""
-        if not user_symptoms or not disease_symptoms:
-            return 0.0
-        
-        user_symptoms_lower = [s.lower() for s in user_symptoms]
-        disease_symptoms_lower = [s.lower() for s in disease_symptoms]
-        
-        # Count exact matches
-        exact_matches = 0
-        for user_symptom in user_symptoms_lower:
-            if user_symptom in disease_symptoms_lower:
-                exact_matches += 1
-        
-        # Count partial matches (synonyms and related terms)
-        partial_matches = 0
-        synonym_map = {
-            'fever': ['temperature', 'hot', 'feverish'],
-            'headache': ['head pain', 'migraine'],
-            'stomach pain': ['stomach ache', 'belly pain', 'abdominal pain'],
-            'sore throat': ['throat pain', 'painful throat'],
-            'runny nose': ['nasal congestion', 'stuffy nose'],
-            'fatigue': ['tired', 'exhausted', 'weakness'],
-            'nausea': ['sick', 'queasy'],
-            'chills': ['cold', 'shivering']
-        }
-        
-        for user_symptom in user_symptoms_lower:
-            for disease_symptom in disease_symptoms_lower:
-                if user_symptom != disease_symptom:  # Avoid double counting exact matches
-                    # Check if they are synonyms
-                    for canonical, synonyms in synonym_map.items():
-                        if ((user_symptom == canonical and disease_symptom in synonyms) or
-                            (disease_symptom == canonical and user_symptom in synonyms) or
-                            (user_symptom in synonyms and disease_symptom in synonyms)):
-                            partial_matches += 0.5
-                            break
-        
+    def match_diseases_batch(self, messages: List[str]) -> List[Optional[Dict]]:
+        """Match each message in a batch to its best disease, for bulk tagging jobs
+
+        Messages are lower-cased here; repeats within and across batches hit the caches.
+        """
+        return [self.match_disease(self.extract_symptoms(message.lower())) for message in messages]
+    
+    def _calculate_match_score(self, exact_matches: int, partial_matches: float,
+                               num_user_symptoms: int, num_disease_symptoms: int) -> float:
+        """Calculate matching score from exact and partial (synonym) match counts"""
         # Calculate score as weighted average
         total_matches = exact_matches + partial_matches
-        max_possible_matches = max(len(user_symptoms), len(disease_symptoms))
+        max_possible_matches = max(num_user_symptoms, num_disease_symptoms)
         
         # Boost score if user has multiple matching symptoms
         if exact_matches >= 2:
@@ -149,7 +274,4 @@ class SymptomMatcher:
     
     def get_disease_info(self, disease_name: str) -> Optional[Dict]:
         """Get detailed information about a specific disease"""
-        for disease in self.diseases_data:
-            if disease['disease'].lower() == disease_name.lower():
-                return disease
-        return None
+        return self._disease_by_name.get(disease_name.lower())
@@ -1,7 +1,10 @@
-from datetime import datetime
+from datetime import date as date_type, datetime
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Integer, String, DateTime, Text, Boolean, JSON, ForeignKey
+from sqlalchemy import Integer, String, Date, DateTime, Text, Boolean, JSON, Enum, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, Optional
 
@@ -10,6 +13,24 @@ class Base(DeclarativeBase):
 
 db = SQLAlchemy(model_class=Base)
 
+class utcnow(FunctionElement):
+    """Current UTC time computed by the database, for naive UTC timestamp columns"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return 'CURRENT_TIMESTAMP'
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    # now() is in the session time zone; existing rows hold UTC from datetime.utcnow
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+# Stored as binary JSONB on PostgreSQL (parsed once on write and indexable), plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -17,53 +38,62 @@ class User(db.Model):
     user_id: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
     plan: Mapped[str] = mapped_column(String(20), default='basic', nullable=False)
     language: Mapped[str] = mapped_column(String(5), default='en', nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
-    # Relationships
-    chat_sessions: Mapped[List["ChatSession"]] = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan")
-    daily_usage: Mapped[List["DailyUsage"]] = relationship("DailyUsage", back_populates="user", cascade="all, delete-orphan")
+    # Relationships; lazy loads raise instead of emitting SQL, so load them up front with
+    # selectinload(User.chat_sessions) and friends at the query site
+    chat_sessions: Mapped[List["ChatSession"]] = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan", lazy='raise_on_sql')
+    daily_usage: Mapped[List["DailyUsage"]] = relationship("DailyUsage", back_populates="user", cascade="all, delete-orphan", lazy='raise_on_sql')
 
 class ChatSession(db.Model):
     __tablename__ = 'chat_sessions'
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    session_data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    session_data: Mapped[dict] = mapped_column(JSONType, nullable=False)
     bot_response_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="chat_sessions")
-    messages: Mapped[List["ChatMessage"]] = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
+    user: Mapped["User"] = relationship("User", back_populates="chat_sessions", lazy='raise_on_sql')
+    messages: Mapped[List["ChatMessage"]] = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan", lazy='raise_on_sql')
+    
+    # Composite index for looking up a user's most recently updated session
+    __table_args__ = (db.Index('ix_chatsession_user_updated', 'user_id', 'updated_at'),)
 
 class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     session_id: Mapped[int] = mapped_column(Integer, ForeignKey('chat_sessions.id'), nullable=False)
-    message_type: Mapped[str] = mapped_column(String(10), nullable=False)  # 'user' or 'bot'
+    message_type: Mapped[str] = mapped_column(Enum('user', 'bot', name='message_type_enum', create_constraint=True), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     disease: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
-    medicines: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    medicines: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
+    # Stamped per row in Python: a turn's user and bot messages share one transaction, where a
+    # database now() would give both the same value and lose their order
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, server_default=utcnow())
     
     # Relationships
-    session: Mapped["ChatSession"] = relationship("ChatSession", back_populates="messages")
+    session: Mapped["ChatSession"] = relationship("ChatSession", back_populates="messages", lazy='raise_on_sql')
+    
+    # Composite index for paging a session's history in creation order
+    __table_args__ = (db.Index('ix_chatmsg_session_created', 'session_id', 'created_at'),)
 
 class DailyUsage(db.Model):
     __tablename__ = 'daily_usage'
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
-    date: Mapped[str] = mapped_column(String(10), nullable=False)  # YYYY-MM-DD format
+    date: Mapped[date_type] = mapped_column(Date, nullable=False)
     chat_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="daily_usage")
+    user: Mapped["User"] = relationship("User", back_populates="daily_usage", lazy='raise_on_sql')
     
     # Unique constraint for user_id and date combination
     __table_args__ = (db.UniqueConstraint('user_id', 'date', name='unique_user_date'),)
@@ -73,10 +103,13 @@ class Disease(db.Model):
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
-    symptoms: Mapped[list] = mapped_column(JSON, nullable=False)
-    medicines: Mapped[list] = mapped_column(JSON, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    symptoms: Mapped[list] = mapped_column(JSONType, nullable=False)
+    medicines: Mapped[list] = mapped_column(JSONType, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
+    
+    # GIN index for symptom containment queries; only PostgreSQL supports it
+    __table_args__ = (db.Index('ix_disease_symptoms_gin', 'symptoms', postgresql_using='gin').ddl_if(dialect='postgresql'),)
 
 class SubscriptionPlan(db.Model):
     __tablename__ = 'subscription_plans'
@@ -90,8 +123,8 @@ class SubscriptionPlan(db.Model):
     medicine_images: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     chat_history: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     voice_chat: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
-    available_languages: Mapped[list] = mapped_column(JSON, nullable=False)
+    available_languages: Mapped[list] = mapped_column(JSONType, nullable=False)
     layout: Mapped[str] = mapped_column(String(20), default='standard', nullable=False)
-    features: Mapped[list] = mapped_column(JSON, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    features: Mapped[list] = mapped_column(JSONType, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
\ No newline at end of file